@@ -5,19 +5,173 @@ This module handles loading configuration from files or environment variables.
 """
 
 import os
+import copy
+import atexit
+import functools
+import json
+import queue
 import yaml
 import logging
-from typing import Dict, Any, Optional
+import logging.handlers
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional
 from pathlib import Path
 from dotenv import load_dotenv
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+_log_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(level: int = logging.INFO, fmt: str = LOG_FORMAT) -> None:
+    """
+    Configure root logging through a background queue listener.
+    
+    Callers only enqueue records; a listener thread writes them to stderr.
+    Like logging.basicConfig, this does nothing if the root logger already
+    has handlers.
+    
+    Args:
+        level: Root logger level
+        fmt: Log record format
+    """
+    global _log_listener
+    root = logging.getLogger()
+    if root.handlers:
+        return
+        
+    log_queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(fmt))
+    
+    _log_listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+    
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+
+def add_log_handler(handler: logging.Handler) -> None:
+    """
+    Attach an extra output handler (e.g. a FileHandler) to root logging.
+    
+    When configure_logging installed the queue listener, the handler is
+    driven by the listener thread, so callers never block on its I/O.
+    Otherwise it is added to the root logger directly.
+    
+    Args:
+        handler: Handler to attach
+    """
+    if _log_listener is not None:
+        # The listener reads this tuple for every record; swap it atomically
+        _log_listener.handlers = _log_listener.handlers + (handler,)
+    else:
+        logging.getLogger().addHandler(handler)
+
+
+# Logging is configured by the entry point (etl_pipeline / DAG), see configure_logging
 logger = logging.getLogger(__name__)
 
+# Prefer the libyaml-backed loader when available (much faster than pure Python)
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Environment overrides: (variable, config key path, cast)
+_ENV_SPEC = (
+    ("SPOTIFY_CLIENT_ID", ("spotify", "client_id"), str),
+    ("SPOTIFY_CLIENT_SECRET", ("spotify", "client_secret"), str),
+    ("SPOTIFY_OUTPUT_FORMAT", ("output", "format"), str),
+    ("SPOTIFY_DATA_PATH", ("paths", "base"), str),
+    ("SPOTIFY_COUNTRY", ("parameters", "country"), str),
+    ("SPOTIFY_LIMIT", ("parameters", "limit"), int),
+)
+_ENV_KEYS = frozenset(env_key for env_key, _, _ in _ENV_SPEC)
+# (variable, raw value) -> cast value, reused by later Config() instances
+_ENV_CAST_CACHE: Dict[tuple, Any] = {}
+
+# Defaults for optional values, applied per section after loading
+_DEFAULTS = {
+    "output": {"format": "parquet"},
+    "paths": {"base": "./data"},
+}
+
+# Sentinel for missing keys and split dot-paths shared by Config.get
+_MISSING = object()
+_KEY_PATHS: Dict[str, tuple] = {}
+
+
+def _get_child(value: Any, key: str) -> Any:
+    """Step one level into a nested config dict, or return _MISSING."""
+    if isinstance(value, dict) and key in value:
+        return value[key]
+    return _MISSING
+
+
+def resolve_config_path(config_path: Optional[str] = None) -> str:
+    """
+    Resolve which configuration file to use.
+    
+    Args:
+        config_path: Explicit path, if any
+        
+    Returns:
+        The explicit path, else SPOTIFY_CONFIG_PATH, else the bundled config.yaml
+    """
+    return config_path or os.environ.get(
+        "SPOTIFY_CONFIG_PATH", 
+        str(Path(__file__).parent / "config.yaml")
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _load_dotenv_once() -> None:
+    """Load the .env file into the environment once per process."""
+    load_dotenv()
+
+
+@functools.lru_cache(maxsize=16)
+def _parse_yaml_cached(path: str, mtime: float) -> Dict[str, Any]:
+    """
+    Parse a YAML file, caching the result per process.
+
+    A JSON copy of the parsed file is kept next to it (``<path>.json``),
+    since JSON parses faster. It records the mtime and size of the YAML it
+    was built from and is only used while both still match exactly.
+
+    Args:
+        path: Absolute path to the YAML file
+        mtime: File modification time, so edits invalidate the cache entry
+
+    Returns:
+        Parsed configuration dictionary
+    """
+    sidecar = path + ".json"
+    # Taken before reading: if the YAML changes while it is parsed, the
+    # sidecar written below no longer matches it and is ignored
+    stat = os.stat(path)
+    source = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+    try:
+        with open(sidecar, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if isinstance(cached, dict) and cached.get("source") == source:
+            return cached["data"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    with open(path, 'r') as f:
+        raw = f.read()
+    data = yaml.load(raw, Loader=_YAML_LOADER) or {}
+
+    # Anchors, aliases and tags may not survive a JSON round-trip
+    if not any(marker in raw for marker in ("&", "*", "!")):
+        try:
+            serialized = json.dumps({"source": source, "data": data})
+            with open(sidecar, 'w', encoding='utf-8') as f:
+                f.write(serialized)
+        except (OSError, TypeError, ValueError) as e:
+            logger.debug("Could not write config cache %s: %s", sidecar, e)
+
+    return data
+
 
 class Config:
     """
@@ -33,10 +187,8 @@ class Config:
             config_path: Path to configuration YAML file
         """
         self.config_data = {}
-        self.config_path = config_path or os.environ.get(
-            "SPOTIFY_CONFIG_PATH", 
-            str(Path(__file__).parent / "config.yaml")
-        )
+        self._get_cache: Dict[str, Any] = {}
+        self.config_path = resolve_config_path(config_path)
         
         # Load configuration
         self._load_config()
@@ -44,18 +196,22 @@ class Config:
     def _load_config(self) -> None:
         """Load configuration from file and environment variables."""
         # Load .env file if it exists
-        load_dotenv()
+        _load_dotenv_once()
         
         self._load_from_file()
         self._load_from_env()
         self._validate_config()
+        self._get_cache.clear()
+        self._freeze_sections()
         
     def _load_from_file(self) -> None:
         """Load configuration from YAML file."""
         try:
             if os.path.exists(self.config_path):
-                with open(self.config_path, 'r') as f:
-                    self.config_data = yaml.safe_load(f) or {}
+                path = os.path.abspath(self.config_path)
+                mtime = os.path.getmtime(path)
+                # Deep copy so env overrides never leak into the cached dict
+                self.config_data = copy.deepcopy(_parse_yaml_cached(path, mtime))
                 logger.info(f"Loaded configuration from {self.config_path}")
             else:
                 logger.warning(f"Config file not found: {self.config_path}")
@@ -71,44 +227,26 @@ class Config:
         Environment variables take precedence over file configuration.
         Variables should be prefixed with SPOTIFY_ and uppercase.
         """
-        # Spotify API credentials
-        if os.environ.get("SPOTIFY_CLIENT_ID"):
-            self.set_nested_dict(self.config_data, 
-                                ["spotify", "client_id"], 
-                                os.environ.get("SPOTIFY_CLIENT_ID"))
-            
-        if os.environ.get("SPOTIFY_CLIENT_SECRET"):
-            self.set_nested_dict(self.config_data, 
-                                ["spotify", "client_secret"], 
-                                os.environ.get("SPOTIFY_CLIENT_SECRET"))
+        env = os.environ
+        # Nothing to override (typical for CI/tests): skip the walk entirely
+        if not any(env_key in env for env_key in _ENV_KEYS):
+            return
             
-        # Output configuration
-        if os.environ.get("SPOTIFY_OUTPUT_FORMAT"):
-            self.set_nested_dict(self.config_data, 
-                                ["output", "format"], 
-                                os.environ.get("SPOTIFY_OUTPUT_FORMAT"))
-            
-        # Data paths
-        if os.environ.get("SPOTIFY_DATA_PATH"):
-            self.set_nested_dict(self.config_data, 
-                                ["paths", "base"], 
-                                os.environ.get("SPOTIFY_DATA_PATH"))
-            
-        # Other parameters
-        if os.environ.get("SPOTIFY_COUNTRY"):
-            self.set_nested_dict(self.config_data, 
-                                ["parameters", "country"], 
-                                os.environ.get("SPOTIFY_COUNTRY"))
-                                
-        if os.environ.get("SPOTIFY_LIMIT"):
-            limit = os.environ.get("SPOTIFY_LIMIT")
+        for env_key, path, cast in _ENV_SPEC:
+            raw = env.get(env_key)
+            if not raw:
+                continue
             try:
-                limit = int(limit)
-            except (ValueError, TypeError):
-                pass
-            self.set_nested_dict(self.config_data, 
-                                ["parameters", "limit"], 
-                                limit)
+                value = _ENV_CAST_CACHE[env_key, raw]
+            except KeyError:
+                try:
+                    value = cast(raw)
+                except (ValueError, TypeError):
+                    value = raw
+                _ENV_CAST_CACHE[env_key, raw] = value
+            # Every env-driven key is exactly section.key deep
+            section, leaf = path
+            self.config_data.setdefault(section, {})[leaf] = value
                                 
     def _validate_config(self) -> None:
         """Validate that required configuration fields are present."""
@@ -122,17 +260,10 @@ class Config:
             logger.warning("Missing Spotify client_secret in configuration")
             
         # Set defaults for missing optional values
-        if "output" not in self.config_data:
-            self.config_data["output"] = {}
-            
-        if "format" not in self.config_data.get("output", {}):
-            self.config_data["output"]["format"] = "csv"
-            
-        if "paths" not in self.config_data:
-            self.config_data["paths"] = {}
-            
-        if "base" not in self.config_data.get("paths", {}):
-            self.config_data["paths"]["base"] = "./data"
+        for section, values in _DEFAULTS.items():
+            section_data = self.config_data.setdefault(section, {})
+            for key, value in values.items():
+                section_data.setdefault(key, value)
             
     @staticmethod
     def set_nested_dict(dictionary: Dict, keys: list, value: Any) -> None:
@@ -160,64 +291,91 @@ class Config:
         Returns:
             Configuration value or default
         """
-        keys = key.split('.')
-        value = self.config_data
+        try:
+            value = self._get_cache[key]
+        except KeyError:
+            keys = _KEY_PATHS.get(key)
+            if keys is None:
+                keys = _KEY_PATHS[key] = tuple(key.split('.'))
+            value = functools.reduce(_get_child, keys, self.config_data)
+            self._get_cache[key] = value
+            
+        return default if value is _MISSING else value
+            
+    def _freeze_sections(self) -> None:
+        """
+        Resolve the derived config sections once.
         
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
-                
-        return value
+        They are stored as read-only mappings so callers can't mutate the
+        shared copy; use dict(...) to get a modifiable one.
+        """
+        base_path = self.get("paths.base", "./data")
+        
+        self._creds = MappingProxyType({
+            "client_id": self.get("spotify.client_id", ""),
+            "client_secret": self.get("spotify.client_secret", "")
+        })
+        self._paths = MappingProxyType({
+            "base": base_path,
+            "raw": self.get("paths.raw", os.path.join(base_path, "raw")),
+            "processed": self.get("paths.processed", os.path.join(base_path, "processed")),
+            "final": self.get("paths.final", os.path.join(base_path, "final"))
+        })
+        self._output = MappingProxyType({
+            "format": self.get("output.format", "parquet"),
+            "prefix": self.get("output.prefix", "spotify")
+        })
+        self._params = MappingProxyType({
+            "country": self.get("parameters.country"),
+            "limit": self.get("parameters.limit", 50)
+        })
+        self._cache = MappingProxyType({
+            "enabled": self.get("cache.enabled", False),
+            "path": self.get("cache.path", os.path.join(base_path, "cache", "spotify_cache.sqlite")),
+            "expire_hours": self.get("cache.expire_hours", 6)
+        })
             
-    def get_spotify_credentials(self) -> Dict[str, str]:
+    def get_spotify_credentials(self) -> Mapping[str, str]:
         """
         Get Spotify API credentials.
         
         Returns:
-            Dictionary with client_id and client_secret
+            Read-only mapping with client_id and client_secret
         """
-        return {
-            "client_id": self.get("spotify.client_id", ""),
-            "client_secret": self.get("spotify.client_secret", "")
-        }
+        return self._creds
         
-    def get_data_paths(self) -> Dict[str, str]:
+    def get_data_paths(self) -> Mapping[str, str]:
         """
         Get configured data paths.
         
         Returns:
-            Dictionary with path configuration
+            Read-only mapping with path configuration
         """
-        base_path = self.get("paths.base", "./data")
-        return {
-            "base": base_path,
-            "raw": self.get("paths.raw", os.path.join(base_path, "raw")),
-            "processed": self.get("paths.processed", os.path.join(base_path, "processed")),
-            "final": self.get("paths.final", os.path.join(base_path, "final"))
-        }
+        return self._paths
         
-    def get_output_config(self) -> Dict[str, Any]:
+    def get_output_config(self) -> Mapping[str, Any]:
         """
         Get output configuration.
         
         Returns:
-            Dictionary with output configuration
+            Read-only mapping with output configuration
         """
-        return {
-            "format": self.get("output.format", "csv"),
-            "prefix": self.get("output.prefix", "spotify")
-        }
+        return self._output
         
-    def get_parameters(self) -> Dict[str, Any]:
+    def get_parameters(self) -> Mapping[str, Any]:
         """
         Get extraction parameters.
         
         Returns:
-            Dictionary with extraction parameters
+            Read-only mapping with extraction parameters
         """
-        return {
-            "country": self.get("parameters.country"),
-            "limit": self.get("parameters.limit", 50)
-        }
\ No newline at end of file
+        return self._params
+        
+    def get_cache_config(self) -> Mapping[str, Any]:
+        """
+        Get API response cache configuration.
+        
+        Returns:
+            Read-only mapping with cache configuration
+        """
+        return self._cache
\ No newline at end of file
@@ -5,7 +5,9 @@ This module defines an Airflow DAG to orchestrate the Spotify ETL pipeline.
 """
 
 import os
+import orjson
 from datetime import datetime, timedelta
+from pathlib import Path
 from airflow import DAG
 from airflow.operators.python import PythonOperator
 from airflow.operators.dummy import DummyOperator
@@ -23,32 +25,60 @@ extract_path = os.path.join(AIRFLOW_HOME, 'scripts', 'extract.py')
 transform_path = os.path.join(AIRFLOW_HOME, 'scripts', 'transform.py')
 load_path = os.path.join(AIRFLOW_HOME, 'scripts', 'load.py')
 
-# Importa los módulos directamente mediante importlib
+# Los módulos se cargan de forma perezosa dentro de las tareas, para que el
+# parseo del DAG por el scheduler no importe pandas ni lea la configuración
+import functools
 import importlib.util
 
-# Carga config.py
-spec_config = importlib.util.spec_from_file_location("config_module", config_path)
-config_module = importlib.util.module_from_spec(spec_config)
-spec_config.loader.exec_module(config_module)
-Config = config_module.Config
+_MODULE_PATHS = {
+   'config': config_path,
+   'extract': extract_path,
+   'transform': transform_path,
+   'load': load_path,
+}
+_MODULES = {}
+
+
+def _load_module(name):
+   """
+   Load one of the pipeline modules from AIRFLOW_HOME.
+   
+   Each module is executed only once per process and then reused.
+   """
+   if name not in _MODULES:
+       spec = importlib.util.spec_from_file_location(f"{name}_module", _MODULE_PATHS[name])
+       module = importlib.util.module_from_spec(spec)
+       spec.loader.exec_module(module)
+       _MODULES[name] = module
+   return _MODULES[name]
+
+
+def _setup_logging():
+   """
+   Configure logging for the task; called first by every task callable.
+   
+   configure_logging is idempotent, and under Airflow the task logger is
+   already set up so it leaves those handlers untouched.
+   """
+   _load_module('config').configure_logging()
+
 
-# Carga extract.py
-spec_extract = importlib.util.spec_from_file_location("extract_module", extract_path)
-extract_module = importlib.util.module_from_spec(spec_extract)
-spec_extract.loader.exec_module(extract_module)
-SpotifyClient = extract_module.SpotifyClient
+@functools.lru_cache(maxsize=1)
+def _get_config():
+   """Build the pipeline Config on first use."""
+   return _load_module('config').Config()
 
-# Carga transform.py
-spec_transform = importlib.util.spec_from_file_location("transform_module", transform_path)
-transform_module = importlib.util.module_from_spec(spec_transform)
-spec_transform.loader.exec_module(transform_module)
-SpotifyTransformer = transform_module.SpotifyTransformer
 
-# Carga load.py
-spec_load = importlib.util.spec_from_file_location("load_module", load_path)
-load_module = importlib.util.module_from_spec(spec_load)
-spec_load.loader.exec_module(load_module)
-SpotifyDataLoader = load_module.SpotifyDataLoader
+def _run_timestamp(context):
+   """
+   Timestamp shared by every task of a DAG run, used in output filenames.
+   
+   Derived from the run's logical date so all tasks name their files alike.
+   """
+   logical_date = context.get('logical_date') or context.get('execution_date')
+   if logical_date is None:
+       return None
+   return logical_date.strftime(_load_module('load').TIMESTAMP_FORMAT)
 
 
 # Default arguments for the DAG
@@ -62,10 +92,6 @@ default_args = {
    'start_date': days_ago(1),
 }
 
-# Initialize global variables
-config = Config()
-extraction_data = {}
-
 
 def extract_spotify_data(**kwargs):
    """
@@ -73,13 +99,30 @@ def extract_spotify_data(**kwargs):
    
    This function is executed as a task in the Airflow DAG.
    """
+   _setup_logging()
+   
+   config = _get_config()
+   SpotifyClient = _load_module('extract').SpotifyClient
+   ResponseCache = _load_module('extract').ResponseCache
+   SpotifyDataLoader = _load_module('load').SpotifyDataLoader
+   
    # Get Spotify credentials
    credentials = config.get_spotify_credentials()
    
+   # Set up the API response cache if enabled
+   cache_config = config.get_cache_config()
+   cache = None
+   if cache_config["enabled"]:
+       cache = ResponseCache(
+           cache_config["path"],
+           expire_after=timedelta(hours=cache_config["expire_hours"])
+       )
+   
    # Initialize Spotify client
    client = SpotifyClient(
        client_id=credentials["client_id"],
-       client_secret=credentials["client_secret"]
+       client_secret=credentials["client_secret"],
+       cache=cache
    )
    
    # Extract data
@@ -95,7 +138,8 @@ def extract_spotify_data(**kwargs):
        base_path=paths["base"],
        raw_dir=paths["raw"],
        processed_dir=paths["processed"],
-       final_dir=paths["final"]
+       final_dir=paths["final"],
+       run_ts=_run_timestamp(kwargs)
    )
    
    # Save raw data
@@ -104,10 +148,7 @@ def extract_spotify_data(**kwargs):
        filename_prefix=output_config["prefix"]
    )
    
-   # Pass data to next task using XCom
-   kwargs['ti'].xcom_push(key='raw_data_path', value=raw_file_path)
-   
-   # Also save extraction stats 
+   # Extraction stats
    stats = {
        'num_releases': len(raw_data.get('releases', [])),
        'num_audio_features': len(raw_data.get('audio_features', [])),
@@ -115,13 +156,12 @@ def extract_spotify_data(**kwargs):
        'timestamp': datetime.now().isoformat()
    }
    
-   kwargs['ti'].xcom_push(key='extraction_stats', value=stats)
-   
-   # Keep copy in global for convenience (though we should use XCom)
-   global extraction_data
-   extraction_data = raw_data
-   
-   return raw_file_path
+   # Pass path and stats to next tasks in a single XCom; nothing is returned,
+   # so PythonOperator doesn't write a second return_value XCom
+   kwargs['ti'].xcom_push(
+       key='extract_result',
+       value={'raw_data_path': raw_file_path, 'stats': stats}
+   )
 
 
 def transform_spotify_data(**kwargs):
@@ -130,15 +170,19 @@ def transform_spotify_data(**kwargs):
    
    This function is executed as a task in the Airflow DAG.
    """
+   _setup_logging()
+   
+   config = _get_config()
+   SpotifyTransformer = _load_module('transform').SpotifyTransformer
+   SpotifyDataLoader = _load_module('load').SpotifyDataLoader
+   
    # Get raw data path from previous task
    ti = kwargs['ti']
-   raw_file_path = ti.xcom_pull(task_ids='extract_spotify_data', key='raw_data_path')
+   extract_result = ti.xcom_pull(task_ids='extract_spotify_data', key='extract_result')
+   raw_file_path = extract_result.get('raw_data_path') if extract_result else None
    
    # Si estamos en modo test o no hay archivo de raw data
    if raw_file_path is None:
-       import os
-       from pathlib import Path
-       
        # Usa un conjunto de datos de ejemplo o busca el archivo más reciente
        paths = config.get_data_paths()
        raw_dir = Path(paths["raw"])
@@ -146,11 +190,16 @@ def transform_spotify_data(**kwargs):
        # Asegurarse de que el directorio existe
        os.makedirs(raw_dir, exist_ok=True)
        
-       # Buscar archivos json en el directorio raw
-       json_files = list(raw_dir.glob("*.json"))
-       if json_files:
+       # Buscar el archivo json más reciente en una sola pasada por el directorio
+       with os.scandir(raw_dir) as entries:
+           newest = max(
+               ((entry.stat().st_mtime, entry.path) for entry in entries
+                if entry.name.endswith('.json') and entry.is_file()),
+               default=None
+           )
+       if newest:
            # Usar el archivo más reciente
-           raw_file_path = str(sorted(json_files, key=os.path.getmtime)[-1])
+           raw_file_path = newest[1]
            print(f"Testing mode: Using most recent raw file: {raw_file_path}")
        else:
            print("No raw data files found. Creating empty dataset for testing.")
@@ -167,7 +216,8 @@ def transform_spotify_data(**kwargs):
                base_path=paths["base"],
                raw_dir=paths["raw"],
                processed_dir=paths["processed"],
-               final_dir=paths["final"]
+               final_dir=paths["final"],
+               run_ts=_run_timestamp(kwargs)
            )
            raw_file_path = loader.save_raw_data(
                raw_data, 
@@ -177,9 +227,7 @@ def transform_spotify_data(**kwargs):
    
    try:
        # Load raw data from file
-       import json
-       with open(raw_file_path, 'r', encoding='utf-8') as f:
-           raw_data = json.load(f)
+       raw_data = orjson.loads(Path(raw_file_path).read_bytes())
    except Exception as e:
        print(f"Error loading raw data: {str(e)}")
        # Crear un conjunto de datos vacío como respaldo
@@ -206,7 +254,8 @@ def transform_spotify_data(**kwargs):
        base_path=paths["base"],
        raw_dir=paths["raw"],
        processed_dir=paths["processed"],
-       final_dir=paths["final"]
+       final_dir=paths["final"],
+       run_ts=_run_timestamp(kwargs)
    )
    
    # Save to processed directory
@@ -216,18 +265,18 @@ def transform_spotify_data(**kwargs):
        prefix=output_config["prefix"]
    )
    
-   # Pass data to next task
+   # Pass paths and stats to next tasks in a single XCom
    stats = {
        'num_albums': len(transformed_data.get('albums', [])),
        'num_tracks': len(transformed_data.get('tracks', [])),
-       'num_audio_features': len(transformed_data.get('audio_features', [])),
-       'processed_paths': processed_paths
+       'num_audio_features': len(transformed_data.get('audio_features', []))
    }
    
-   kwargs['ti'].xcom_push(key='transformation_stats', value=stats)
-   kwargs['ti'].xcom_push(key='processed_paths', value=processed_paths)
-   
-   return processed_paths
+   # Nothing is returned, so no extra return_value XCom is written
+   kwargs['ti'].xcom_push(
+       key='transform_result',
+       value={'processed_paths': processed_paths, 'stats': stats}
+   )
 
 
 def load_spotify_data(**kwargs):
@@ -236,9 +285,12 @@ def load_spotify_data(**kwargs):
    
    This function is executed as a task in the Airflow DAG.
    """
+   _setup_logging()
+   
    # Get processed data paths from previous task
    ti = kwargs['ti']
-   processed_paths = ti.xcom_pull(task_ids='transform_spotify_data', key='processed_paths')
+   transform_result = ti.xcom_pull(task_ids='transform_spotify_data', key='transform_result')
+   processed_paths = transform_result.get('processed_paths') if transform_result else None
    
    # Handle test mode with no processed paths
    if processed_paths is None:
@@ -249,6 +301,8 @@ def load_spotify_data(**kwargs):
    # For now, we'll just copy to final directory and create symlinks
    
    # Load transformed data from processed directory
+   config = _get_config()
+   SpotifyDataLoader = _load_module('load').SpotifyDataLoader
    paths = config.get_data_paths()
    output_config = config.get_output_config()
    
@@ -256,7 +310,8 @@ def load_spotify_data(**kwargs):
        base_path=paths["base"],
        raw_dir=paths["raw"],
        processed_dir=paths["processed"],
-       final_dir=paths["final"]
+       final_dir=paths["final"],
+       run_ts=_run_timestamp(kwargs)
    )
    
    # Create symlinks to latest versions
@@ -279,10 +334,14 @@ def send_completion_notification(**kwargs):
    
    This function is executed as a task in the Airflow DAG.
    """
+   _setup_logging()
+   
    # Get stats from previous tasks
    ti = kwargs['ti']
-   extraction_stats = ti.xcom_pull(task_ids='extract_spotify_data', key='extraction_stats')
-   transformation_stats = ti.xcom_pull(task_ids='transform_spotify_data', key='transformation_stats')
+   extract_result = ti.xcom_pull(task_ids='extract_spotify_data', key='extract_result') or {}
+   transform_result = ti.xcom_pull(task_ids='transform_spotify_data', key='transform_result') or {}
+   extraction_stats = extract_result.get('stats')
+   transformation_stats = transform_result.get('stats')
    
    # Handle test mode with no stats
    if extraction_stats is None:
@@ -6,27 +6,39 @@ This module orchestrates the entire ETL process for Spotify data.
 
 import os
 import sys
+import functools
 import logging
-import pandas as pd
-from datetime import datetime
-from typing import Dict, Any, Optional
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, Any, Optional
 
 # Add the parent directory to sys.path for imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from scripts.extract import SpotifyClient
+from scripts.extract import ResponseCache, SpotifyClient
 from scripts.transform import SpotifyTransformer
-from scripts.load import SpotifyDataLoader
-from config.config import Config
+from scripts.load import TIMESTAMP_FORMAT, SpotifyDataLoader
+from config.config import Config, add_log_handler, configure_logging, resolve_config_path
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# pandas is only needed for annotations here; SpotifyTransformer imports it
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Logging is configured by the entry point, see main()
 logger = logging.getLogger(__name__)
 
 
+@functools.lru_cache(maxsize=4)
+def _get_config(config_path: str, mtime: float) -> Config:
+    """Build a Config once per (path, mtime), so edits to the file reload it."""
+    return Config(config_path)
+
+
+def _row_count(dataframes: Dict[str, "pd.DataFrame"], name: str) -> int:
+    """Number of rows in a transformed dataset, 0 if it is missing."""
+    df = dataframes.get(name)
+    return len(df) if df is not None else 0
+
+
 class SpotifyETLPipeline:
     """
     Main ETL Pipeline for Spotify data.
@@ -40,12 +52,14 @@ class SpotifyETLPipeline:
         Args:
             config_path: Path to configuration file (optional)
         """
-        # Load configuration
-        self.config = Config(config_path)
+        # Load configuration (shared while the file is unchanged)
+        resolved = os.path.abspath(resolve_config_path(config_path))
+        mtime = os.path.getmtime(resolved) if os.path.exists(resolved) else 0
+        self.config = _get_config(resolved, mtime)
         
         # Initialize extraction timestamp
         self.extraction_timestamp = datetime.now()
-        self.timestamp_str = self.extraction_timestamp.strftime("%Y%m%d_%H%M%S")
+        self.timestamp_str = self.extraction_timestamp.strftime(TIMESTAMP_FORMAT)
         
         # Set up logging based on config
         self._setup_logging()
@@ -70,9 +84,10 @@ class SpotifyETLPipeline:
             if log_dir and not os.path.exists(log_dir):
                 os.makedirs(log_dir)
                 
+            # Written by the logging listener thread, not the caller
             file_handler = logging.FileHandler(log_file)
             file_handler.setFormatter(logging.Formatter(log_format))
-            logging.getLogger().addHandler(file_handler)
+            add_log_handler(file_handler)
             
     def extract(self) -> Dict[str, Any]:
         """
@@ -86,10 +101,20 @@ class SpotifyETLPipeline:
         # Get Spotify credentials
         credentials = self.config.get_spotify_credentials()
         
+        # Set up the API response cache if enabled
+        cache_config = self.config.get_cache_config()
+        cache = None
+        if cache_config["enabled"]:
+            cache = ResponseCache(
+                cache_config["path"],
+                expire_after=timedelta(hours=cache_config["expire_hours"])
+            )
+        
         # Initialize Spotify client
         client = SpotifyClient(
             client_id=credentials["client_id"],
-            client_secret=credentials["client_secret"]
+            client_secret=credentials["client_secret"],
+            cache=cache
         )
         
         # Extract data
@@ -102,7 +127,7 @@ class SpotifyETLPipeline:
         logger.info("Extraction phase completed")
         return raw_data
         
-    def transform(self, raw_data: Dict[str, Any]) -> Dict[str, pd.DataFrame]:
+    def transform(self, raw_data: Dict[str, Any]) -> Dict[str, "pd.DataFrame"]:
         """
         Transform raw data into structured DataFrames.
         
@@ -129,7 +154,7 @@ class SpotifyETLPipeline:
         
     def load(self, 
            raw_data: Dict[str, Any], 
-           transformed_data: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+           transformed_data: Dict[str, "pd.DataFrame"]) -> Dict[str, Any]:
         """
         Load data to destination.
         
@@ -153,7 +178,8 @@ class SpotifyETLPipeline:
             base_path=paths["base"],
             raw_dir=paths["raw"],
             processed_dir=paths["processed"],
-            final_dir=paths["final"]
+            final_dir=paths["final"],
+            run_ts=self.timestamp_str
         )
         
         # Save raw data
@@ -210,10 +236,8 @@ class SpotifyETLPipeline:
                 "elapsed_seconds": elapsed_time,
                 "output_paths": output_paths,
                 "stats": {
-                    "albums": len(transformed_data.get("albums", pd.DataFrame())),
-                    "tracks": len(transformed_data.get("tracks", pd.DataFrame())),
-                    "audio_features": len(transformed_data.get("audio_features", pd.DataFrame())),
-                    "categories": len(transformed_data.get("categories", pd.DataFrame()))
+                    name: _row_count(transformed_data, name)
+                    for name in ("albums", "tracks", "audio_features", "categories")
                 }
             }
             
@@ -245,6 +269,9 @@ def main():
     parser.add_argument("--config", help="Path to configuration file")
     args = parser.parse_args()
     
+    # Configure logging
+    configure_logging()
+    
     # Run the pipeline
     pipeline = SpotifyETLPipeline(config_path=args.config)
     result = pipeline.run()
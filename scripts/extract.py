@@ -4,38 +4,231 @@ Spotify API Client for ETL Pipeline
 This module provides a client for extracting data from Spotify API.
 """
 
+import os
+import json
+import asyncio
+import contextlib
+import hashlib
+import sqlite3
+import aiohttp
+import orjson
 import requests
 import logging
-from typing import Dict, List, Optional, Union, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Iterator, List, Optional, Tuple, Union, Any
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Logging is configured by the entry point (etl_pipeline / DAG)
 logger = logging.getLogger(__name__)
 
+def _chunks(items: List[Any], size: int) -> List[List[Any]]:
+    """Split a list into consecutive chunks of at most size items."""
+    return [items[i:i+size] for i in range(0, len(items), size)]
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter shared by concurrent async requests.
+    Allows bursts of up to `capacity` requests while keeping the
+    long-run rate at or below `rate` requests per second.
+    """
+    
+    def __init__(self, capacity: float, rate: float):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            capacity: Maximum number of tokens (burst size)
+            rate: Tokens added per second
+        """
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = float(capacity)
+        self.last_refill = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        
+    def _get_lock(self) -> asyncio.Lock:
+        """Lock for the running event loop (each asyncio.run() starts a new one)."""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+        return self._lock
+        
+    async def acquire(self) -> None:
+        """Wait until a token is available and consume it."""
+        async with self._get_lock():
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                    
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ResponseCache:
+    """
+    SQLite-backed cache for idempotent Spotify API responses.
+    Entries older than `expire_after` are ignored, and deleted each time
+    the cache is opened.
+    """
+    
+    def __init__(self, path: str, expire_after: timedelta = timedelta(hours=6)):
+        """
+        Initialize the cache, creating the database if needed and
+        pruning expired entries.
+        
+        Args:
+            path: Path to the SQLite database file
+            expire_after: How long a cached response stays valid
+        """
+        self.path = path
+        self.expire_seconds = expire_after.total_seconds()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(endpoint_hash TEXT PRIMARY KEY, body BLOB, fetched_at INTEGER)"
+            )
+            # ID sets change from day to day, so old entries are rarely reused
+            conn.execute(
+                "DELETE FROM responses WHERE fetched_at < ?",
+                (self._oldest_valid(),)
+            )
+            
+    def _oldest_valid(self) -> int:
+        """Earliest fetched_at timestamp that hasn't expired yet."""
+        return int(time.time() - self.expire_seconds)
+            
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a connection for a single transaction and always close it."""
+        conn = sqlite3.connect(self.path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+        
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[Dict] = None) -> str:
+        """Stable hash of an endpoint and its query parameters."""
+        raw = endpoint + json.dumps(params or {}, sort_keys=True)
+        return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+        
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Get a cached response.
+        
+        Args:
+            key: Cache key from make_key
+            
+        Returns:
+            Cached response, or None if missing or expired
+        """
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT body FROM responses WHERE endpoint_hash = ? AND fetched_at >= ?",
+                    (key, self._oldest_valid())
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Response cache read failed: %s", e)
+            return None
+            
+        if row is None:
+            return None
+        try:
+            return orjson.loads(row[0])
+        except ValueError as e:
+            # A corrupt entry is just a miss; the fresh response overwrites it
+            logger.warning("Ignoring unreadable cache entry %s: %s", key, e)
+            return None
+        
+    def set(self, key: str, data: Dict) -> None:
+        """
+        Store a response in the cache.
+        
+        Args:
+            key: Cache key from make_key
+            data: Response to cache
+        """
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                    (key, orjson.dumps(data), int(time.time()))
+                )
+        except sqlite3.Error as e:
+            logger.warning("Response cache write failed: %s", e)
+
 
 class SpotifyClient:
     """Client for interacting with the Spotify API."""
     
     BASE_URL = "https://api.spotify.com/v1"
     AUTH_URL = "https://accounts.spotify.com/api/token"
+    MAX_RETRIES = 3
+    # Longest rate-limit wait (seconds) honored before giving up on a request
+    MAX_RETRY_DELAY = 60
+    
+    # Maximum IDs per request on the bulk endpoints
+    ALBUMS_BATCH_SIZE = 20
+    ARTISTS_BATCH_SIZE = 50
+    AUDIO_FEATURES_BATCH_SIZE = 100
     
-    def __init__(self, client_id: str, client_secret: str):
+    # Endpoints whose responses change slowly enough to cache
+    CACHEABLE_ENDPOINTS = ("albums", "artists", "browse/categories", "audio-features")
+    
+    def __init__(self, 
+                 client_id: str, 
+                 client_secret: str, 
+                 max_concurrency: int = 8,
+                 cache: Optional[ResponseCache] = None):
         """
         Initialize the Spotify client.
         
         Args:
             client_id: Spotify API client ID
             client_secret: Spotify API client secret
+            max_concurrency: Maximum concurrent requests in the async extraction
+            cache: Optional response cache for idempotent endpoints
         """
         self.client_id = client_id
         self.client_secret = client_secret
+        self.max_concurrency = max_concurrency
+        self.cache = cache
         self.token = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.bucket = TokenBucket(capacity=20, rate=10)
+        self.session = self._create_session()
         self._get_token()
+        
+    @staticmethod
+    def _create_session() -> requests.Session:
+        """
+        Create an HTTP session that reuses connections to the Spotify API.
+        
+        Transient failures (429 and 5xx) are retried with backoff by urllib3.
+        """
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=retry)
+        
+        session = requests.Session()
+        session.mount("https://", adapter)
+        return session
     
     def _get_token(self) -> None:
         """
@@ -50,14 +243,33 @@ class SpotifyClient:
         }
         
         try:
-            response = requests.post(self.AUTH_URL, headers=headers, data=data)
+            response = self.session.post(self.AUTH_URL, headers=headers, data=data)
             response.raise_for_status()
-            self.token = response.json().get("access_token")
+            self.token = orjson.loads(response.content).get("access_token")
             logger.info("Successfully obtained Spotify API token")
         except requests.exceptions.RequestException as e:
             logger.error(f"Authentication error: {str(e)}")
             raise
     
+    def _cache_key(self, endpoint: str, params: Optional[Dict] = None) -> Optional[str]:
+        """Cache key for a request, or None when the endpoint isn't cached."""
+        if self.cache is None or not endpoint.startswith(self.CACHEABLE_ENDPOINTS):
+            return None
+        return ResponseCache.make_key(endpoint, params)
+        
+    def _cached_response(self, 
+                         endpoint: str, 
+                         params: Optional[Dict] = None) -> Tuple[Optional[str], Optional[Dict]]:
+        """
+        Look up a cached response for an endpoint.
+        
+        Returns:
+            Tuple of (cache key, cached response); the key is None when the
+            endpoint isn't cached and the response is None on a miss
+        """
+        key = self._cache_key(endpoint, params)
+        return key, (self.cache.get(key) if key else None)
+        
     def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Dict:
         """
         Make a request to the Spotify API.
@@ -69,6 +281,10 @@ class SpotifyClient:
         Returns:
             JSON response as dictionary
         """
+        cache_key, cached = self._cached_response(endpoint, params)
+        if cached is not None:
+            return cached
+            
         if not self.token:
             self._get_token()
             
@@ -76,17 +292,20 @@ class SpotifyClient:
         headers = {"Authorization": f"Bearer {self.token}"}
         
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = self.session.get(url, headers=headers, params=params)
             
             # If token expired, get a new one and retry
             if response.status_code == 401:
                 logger.info("Token expired, refreshing...")
                 self._get_token()
                 headers = {"Authorization": f"Bearer {self.token}"}
-                response = requests.get(url, headers=headers, params=params)
+                response = self.session.get(url, headers=headers, params=params)
             
             response.raise_for_status()
-            return response.json()
+            data = orjson.loads(response.content)
+            if cache_key:
+                self.cache.set(cache_key, data)
+            return data
             
         except requests.exceptions.HTTPError as e:
             logger.error(f"HTTP error when calling {endpoint}: {str(e)}")
@@ -128,9 +347,9 @@ class SpotifyClient:
             List of audio features dictionaries
         """
         # Spotify API limits to 100 tracks per request
-        if len(track_ids) > 100:
-            logger.warning(f"Limiting to 100 tracks out of {len(track_ids)} requested")
-            track_ids = track_ids[:100]
+        if len(track_ids) > self.AUDIO_FEATURES_BATCH_SIZE:
+            logger.warning("Limiting to %d tracks out of %d requested", self.AUDIO_FEATURES_BATCH_SIZE, len(track_ids))
+            track_ids = track_ids[:self.AUDIO_FEATURES_BATCH_SIZE]
             
         params = {"ids": ",".join(track_ids)}
         
@@ -190,87 +409,338 @@ class SpotifyClient:
         except Exception as e:
             logger.error(f"Failed to get info for artist {artist_id}: {str(e)}")
             return None
-
-    def extract_full_dataset(self) -> Dict[str, Any]:
+            
+    def get_albums_bulk(self, album_ids: List[str]) -> List[Dict]:
         """
-        Extract a complete dataset from Spotify including releases, tracks, and audio features.
+        Get full album objects, including their first page of tracks.
         
+        Args:
+            album_ids: List of Spotify album IDs (requested 20 at a time)
+            
         Returns:
-            Dictionary with all extracted data
+            List of album dictionaries
+        """
+        albums = []
+        for chunk in _chunks(album_ids, self.ALBUMS_BATCH_SIZE):
+            try:
+                response = self._make_request("albums", {"ids": ",".join(chunk)})
+                albums.extend(album for album in response.get("albums", []) if album)
+            except Exception as e:
+                logger.error("Failed to get albums %s: %s", chunk, e)
+        return albums
+        
+    def get_artists_bulk(self, artist_ids: List[str]) -> List[Dict]:
         """
-        # 1. Get new releases
-        logger.info("Extracting new releases...")
-        releases = self.get_new_releases(limit=50)
-        if not releases:
-            logger.error("No releases found")
-            return {}
+        Get detailed information about several artists.
+        
+        Args:
+            artist_ids: List of Spotify artist IDs (requested 50 at a time)
             
-        # 2. Enrich releases with tracks and artist info
-        enriched_releases = []
-        all_track_ids = []
+        Returns:
+            List of artist dictionaries
+        """
+        artists = []
+        for chunk in _chunks(artist_ids, self.ARTISTS_BATCH_SIZE):
+            try:
+                response = self._make_request("artists", {"ids": ",".join(chunk)})
+                artists.extend(artist for artist in response.get("artists", []) if artist)
+            except Exception as e:
+                logger.error("Failed to get artists %s: %s", chunk, e)
+        return artists
+
+    @staticmethod
+    def _enrich_album(album: Dict, tracks: List[Dict], artist_info: Optional[Dict]) -> Dict:
+        """
+        Build the enriched album object stored in the raw dataset.
         
-        for album in releases:
-            album_id = album["id"]
-            album_name = album["name"]
+        Args:
+            album: Album as returned by the new releases endpoint
+            tracks: The album's tracks
+            artist_info: Details of the album's main artist, if available
             
-            logger.info(f"Getting tracks for album: {album_name}")
+        Returns:
+            Enriched album dictionary
+        """
+        return {
+            "album_id": album["id"],
+            "album_name": album["name"],
+            "album_type": album.get("album_type"),
+            "release_date": album.get("release_date"),
+            "total_tracks": album.get("total_tracks"),
+            "popularity": album.get("popularity", 0),
+            "artists": [{"id": artist["id"], "name": artist["name"]} 
+                       for artist in album.get("artists", [])],
+            "main_artist_details": artist_info,
+            "tracks": tracks,
+            "image_url": album.get("images", [{}])[0].get("url") 
+                        if album.get("images") else None,
+            "spotify_url": album.get("external_urls", {}).get("spotify"),
+            "available_markets": album.get("available_markets", [])
+        }
+        
+    @staticmethod
+    def _main_artist_ids(releases: List[Dict]) -> List[str]:
+        """Unique IDs of each release's main artist, in order."""
+        return list(dict.fromkeys(
+            album["artists"][0]["id"] for album in releases if album.get("artists")
+        ))
+        
+    def _assemble_releases(self, 
+                           releases: List[Dict], 
+                           albums: List[Dict], 
+                           artists: List[Dict]) -> List[Dict]:
+        """
+        Combine new releases with their full album and artist objects.
+        
+        Args:
+            releases: Albums from the new releases endpoint
+            albums: Full album objects (with tracks) from the bulk endpoint
+            artists: Artist objects from the bulk endpoint
             
-            # Get tracks
-            tracks = self.get_tracks_from_album(album_id)
+        Returns:
+            List of enriched album dictionaries, skipping albums without tracks
+        """
+        tracks_by_album = {album["id"]: (album.get("tracks") or {}).get("items", []) for album in albums}
+        artists_by_id = {artist["id"]: artist for artist in artists}
+        
+        enriched_releases = []
+        for album in releases:
+            tracks = tracks_by_album.get(album["id"])
             if not tracks:
                 continue
                 
-            # Get artist info
             artist_info = None
-            if album.get("artists") and len(album["artists"]) > 0:
-                artist_id = album["artists"][0]["id"]
-                artist_info = self.get_artist_info(artist_id)
+            if album.get("artists"):
+                artist_info = artists_by_id.get(album["artists"][0]["id"])
                 
-            # Collect track IDs for audio features
-            track_ids = [track["id"] for track in tracks if track.get("id")]
-            all_track_ids.extend(track_ids)
-            
-            # Create enriched album object
-            enriched_album = {
-                "album_id": album["id"],
-                "album_name": album["name"],
-                "album_type": album.get("album_type"),
-                "release_date": album.get("release_date"),
-                "total_tracks": album.get("total_tracks"),
-                "popularity": album.get("popularity", 0),
-                "artists": [{"id": artist["id"], "name": artist["name"]} 
-                           for artist in album.get("artists", [])],
-                "main_artist_details": artist_info,
-                "tracks": tracks,
-                "image_url": album.get("images", [{}])[0].get("url") 
-                            if album.get("images") else None,
-                "spotify_url": album.get("external_urls", {}).get("spotify"),
-                "available_markets": album.get("available_markets", [])
-            }
-            
-            enriched_releases.append(enriched_album)
-            
-        # 3. Get audio features for tracks (in batches)
-        logger.info("Getting audio features...")
-        audio_features = []
-        batch_size = 100
-        
-        for i in range(0, len(all_track_ids), batch_size):
-            batch = all_track_ids[i:i+batch_size]
-            if batch:
-                logger.info(f"Processing audio features batch {i//batch_size + 1}...")
-                features = self.get_audio_features(batch)
-                if features:
-                    audio_features.extend(features)
+            enriched_releases.append(self._enrich_album(album, tracks, artist_info))
+            
+        return enriched_releases
+        
+    @staticmethod
+    def _track_ids(releases: List[Dict]) -> List[str]:
+        """IDs of every track across the enriched releases, skipping tracks without one."""
+        return [track["id"] 
+                for album in releases 
+                for track in album["tracks"] if track.get("id")]
+        
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Concurrency semaphore for the running event loop (each asyncio.run() starts a new one)."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+        
+    async def _make_request_async(self, 
+                                  session: aiohttp.ClientSession, 
+                                  endpoint: str, 
+                                  params: Optional[Dict] = None) -> Dict:
+        """
+        Make a request to the Spotify API on a shared aiohttp session.
+        
+        Args:
+            session: Open aiohttp session
+            endpoint: API endpoint to call
+            params: Optional query parameters
+            
+        Returns:
+            JSON response as dictionary
+        """
+        # SQLite access is blocking, so it runs off the event loop
+        cache_key = self._cache_key(endpoint, params)
+        if cache_key:
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                return cached
+            
+        if not self.token:
+            await asyncio.to_thread(self._get_token)
+            
+        semaphore = self._get_semaphore()
+        url = f"{self.BASE_URL}/{endpoint}"
+        
+        try:
+            for attempt in range(self.MAX_RETRIES + 1):
+                # Bound the number of requests in flight
+                async with semaphore:
+                    await self.bucket.acquire()
+                    response = await session.get(
+                        url, headers={"Authorization": f"Bearer {self.token}"}, params=params
+                    )
                     
-        # 4. Get categories
-        logger.info("Getting categories...")
-        categories = self.get_categories(limit=50)
+                    # If token expired, get a new one and retry
+                    if response.status == 401:
+                        response.release()
+                        logger.info("Token expired, refreshing...")
+                        await asyncio.to_thread(self._get_token)
+                        await self.bucket.acquire()
+                        response = await session.get(
+                            url, headers={"Authorization": f"Bearer {self.token}"}, params=params
+                        )
+                        
+                    delay = self._retry_delay(response, attempt)
+                    if delay is None:
+                        async with response:
+                            response.raise_for_status()
+                            data = orjson.loads(await response.read())
+                        if cache_key:
+                            await asyncio.to_thread(self.cache.set, cache_key, data)
+                        return data
+                            
+                    response.release()
+                    
+                # Rate limited: back off outside the semaphore, then retry
+                logger.warning("Rate limited on %s, retrying in %ss...", endpoint, delay)
+                await asyncio.sleep(delay)
+                
+        except aiohttp.ClientResponseError as e:
+            logger.error("HTTP error when calling %s: %s", endpoint, e)
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error("Error when calling %s: %s", endpoint, e)
+            raise
+            
+    def _retry_delay(self, response: aiohttp.ClientResponse, attempt: int) -> Optional[float]:
+        """
+        Seconds to wait before retrying a rate-limited (429) response.
+        
+        Honors the Retry-After header, falling back to exponential backoff.
         
-        # 5. Create final dataset
+        Returns:
+            The delay, or None when the response should not be retried: it
+            isn't a 429, retries are exhausted, or the wait would exceed
+            MAX_RETRY_DELAY
+        """
+        if response.status != 429 or attempt == self.MAX_RETRIES:
+            return None
+            
+        try:
+            delay = float(response.headers["Retry-After"])
+        except (KeyError, ValueError):
+            delay = float(2 ** attempt)
+            
+        if delay > self.MAX_RETRY_DELAY:
+            logger.warning("Retry-After of %ss for %s exceeds %ss, giving up", 
+                           delay, response.url, self.MAX_RETRY_DELAY)
+            return None
+        return delay
+            
+    async def _get_new_releases_async(self, session: aiohttp.ClientSession, limit: int = 50) -> List[Dict]:
+        """Async twin of get_new_releases."""
+        try:
+            response = await self._make_request_async(
+                session, "browse/new-releases", {"limit": min(limit, 50)}
+            )
+            return response.get("albums", {}).get("items", [])
+        except Exception as e:
+            logger.error("Failed to get new releases: %s", e)
+            return []
+            
+    async def _get_categories_async(self, session: aiohttp.ClientSession, limit: int = 50) -> List[Dict]:
+        """Async twin of get_categories."""
+        try:
+            response = await self._make_request_async(session, "browse/categories", {"limit": limit})
+            return response.get("categories", {}).get("items", [])
+        except Exception as e:
+            logger.error("Failed to get categories: %s", e)
+            return []
+            
+    async def _get_bulk_async(self, 
+                              session: aiohttp.ClientSession, 
+                              endpoint: str, 
+                              ids: List[str], 
+                              batch_size: int) -> List[Dict]:
+        """
+        Async twin of get_albums_bulk / get_artists_bulk.
+        
+        Args:
+            session: Open aiohttp session
+            endpoint: Bulk endpoint, "albums" or "artists"
+            ids: Spotify IDs to fetch
+            batch_size: Maximum IDs per request
+            
+        Returns:
+            List of objects found, with all chunks requested concurrently
+        """
+        async def fetch(chunk):
+            try:
+                response = await self._make_request_async(session, endpoint, {"ids": ",".join(chunk)})
+                return [item for item in response.get(endpoint, []) if item]
+            except Exception as e:
+                logger.error("Failed to get %s %s: %s", endpoint, chunk, e)
+                return []
+                
+        results = await asyncio.gather(*[fetch(chunk) for chunk in _chunks(ids, batch_size)])
+        return [item for result in results for item in result]
+        
+    async def _get_audio_features_async(self, session: aiohttp.ClientSession, track_ids: List[str]) -> List[Dict]:
+        """Async twin of get_audio_features for a batch of at most 100 IDs."""
+        try:
+            response = await self._make_request_async(
+                session, "audio-features", 
+                {"ids": ",".join(track_ids[:self.AUDIO_FEATURES_BATCH_SIZE])}
+            )
+            return response.get("audio_features", [])
+        except Exception as e:
+            logger.error("Failed to get audio features: %s", e)
+            return []
+            
+    async def extract_full_dataset_async(self) -> Dict[str, Any]:
+        """
+        Extract a complete dataset from Spotify, issuing independent requests concurrently.
+        
+        Returns:
+            Dictionary with all extracted data
+        """
+        timeout = aiohttp.ClientTimeout(total=10)
+        connector = aiohttp.TCPConnector(limit=20)
+        
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            # 1. Get new releases and categories
+            logger.info("Extracting new releases and categories...")
+            releases, categories = await asyncio.gather(
+                self._get_new_releases_async(session, limit=50),
+                self._get_categories_async(session, limit=50)
+            )
+            if not releases:
+                logger.error("No releases found")
+                return {}
+                
+            # 2. Enrich releases with tracks and artist info (bulk endpoints)
+            logger.info("Getting tracks and artists for %d albums...", len(releases))
+            albums, artists = await asyncio.gather(
+                self._get_bulk_async(session, "albums", 
+                                     [album["id"] for album in releases], 
+                                     self.ALBUMS_BATCH_SIZE),
+                self._get_bulk_async(session, "artists", 
+                                     self._main_artist_ids(releases), 
+                                     self.ARTISTS_BATCH_SIZE)
+            )
+            enriched_releases = self._assemble_releases(releases, albums, artists)
+                    
+            # 3. Get audio features for all tracks, every batch concurrently
+            logger.info("Getting audio features...")
+            all_track_ids = self._track_ids(enriched_releases)
+            batches = await asyncio.gather(
+                *[self._get_audio_features_async(session, batch)
+                  for batch in _chunks(all_track_ids, self.AUDIO_FEATURES_BATCH_SIZE)]
+            )
+            audio_features = [feature for batch in batches for feature in batch]
+            
+        # 4. Create final dataset
         return {
             "extraction_timestamp": datetime.now().isoformat(),
             "releases": enriched_releases,
             "audio_features": audio_features,
             "categories": categories
-        }
\ No newline at end of file
+        }
+        
+    def extract_full_dataset(self) -> Dict[str, Any]:
+        """
+        Extract a complete dataset from Spotify including releases, tracks, and audio features.
+        
+        Returns:
+            Dictionary with all extracted data
+        """
+        return asyncio.run(self.extract_full_dataset_async())
\ No newline at end of file
@@ -5,20 +5,28 @@ This module handles loading transformed data to various destinations.
 """
 
 import os
-import json
+import orjson
 import pandas as pd
 import logging
 from typing import Dict, List, Optional, Union, Any
 from datetime import datetime
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Logging is configured by the entry point (etl_pipeline / DAG)
 logger = logging.getLogger(__name__)
 
+# Timestamp format used in output filenames
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+
+def _dump_json(data: Any, pretty: bool = False) -> bytes:
+    """Serialize data to UTF-8 JSON bytes, indented by 2 if pretty."""
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    return orjson.dumps(data, option=option)
+
 
 class SpotifyDataLoader:
     """
@@ -30,7 +38,8 @@ class SpotifyDataLoader:
                  base_path: str = "./data",
                  raw_dir: str = "raw",
                  processed_dir: str = "processed",
-                 final_dir: str = "final"):
+                 final_dir: str = "final",
+                 run_ts: Optional[str] = None):
         """
         Initialize the data loader.
         
@@ -39,7 +48,10 @@ class SpotifyDataLoader:
             raw_dir: Directory for raw data
             processed_dir: Directory for processed data
             final_dir: Directory for final data products
+            run_ts: Timestamp used in every output filename of this run
+                (defaults to now, in TIMESTAMP_FORMAT)
         """
+        self.run_ts = run_ts or datetime.now().strftime(TIMESTAMP_FORMAT)
         self.base_path = Path(base_path)
         self.raw_dir = self.base_path / raw_dir
         self.processed_dir = self.base_path / processed_dir
@@ -53,24 +65,27 @@ class SpotifyDataLoader:
         for directory in [self.raw_dir, self.processed_dir, self.final_dir]:
             directory.mkdir(parents=True, exist_ok=True)
             
-    def save_raw_data(self, data: Dict[str, Any], filename_prefix: str = "spotify_raw") -> str:
+    def save_raw_data(self, 
+                      data: Dict[str, Any], 
+                      filename_prefix: str = "spotify_raw",
+                      pretty: bool = False) -> str:
         """
         Save raw data to a JSON file.
         
         Args:
             data: Raw data dictionary
             filename_prefix: Prefix for the output filename
+            pretty: Indent the JSON for human reading (larger, slower)
             
         Returns:
             Path to the saved file
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{filename_prefix}_{timestamp}.json"
+        filename = f"{filename_prefix}_{self.run_ts}.json"
         file_path = self.raw_dir / filename
         
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=4)
+            with open(file_path, 'wb') as f:
+                f.write(_dump_json(data, pretty=pretty))
                 
             logger.info(f"Raw data saved to {file_path}")
             return str(file_path)
@@ -78,90 +93,112 @@ class SpotifyDataLoader:
             logger.error(f"Error saving raw data: {str(e)}")
             raise
             
-    def save_processed_data(self, 
-                          dataframes: Dict[str, pd.DataFrame], 
-                          format: str = "csv",
-                          prefix: str = "spotify") -> Dict[str, str]:
+    @staticmethod
+    def _write_dataframe(df: pd.DataFrame, file_path: Path, format: str) -> None:
         """
-        Save processed DataFrames to files.
+        Write a DataFrame to disk in the given format.
+        
+        For the binary formats, ID columns are stored as Arrow strings so
+        the file keeps a typed, stable schema; categorical columns are kept
+        as they are and written dictionary-encoded.
+        
+        Args:
+            df: DataFrame to write
+            file_path: Destination file
+            format: File format (parquet, feather or csv)
+        """
+        format = format.lower()
+        
+        if format in ("parquet", "feather"):
+            id_columns = [c for c in df.columns 
+                          if c.endswith("_id") and not isinstance(df[c].dtype, pd.CategoricalDtype)]
+            df = df.astype({c: "string[pyarrow]" for c in id_columns})
+            
+        if format == "parquet":
+            df.to_parquet(file_path, engine="pyarrow", compression="snappy", index=False)
+        elif format == "feather":
+            df.reset_index(drop=True).to_feather(file_path, compression="lz4")
+        elif format == "csv":
+            df.to_csv(file_path, index=False)
+        else:
+            raise ValueError(f"Unsupported format: {format}")
+            
+    def _save_dataframes(self, 
+                         dataframes: Dict[str, pd.DataFrame], 
+                         directory: Path, 
+                         format: str, 
+                         prefix: str, 
+                         label: str) -> Dict[str, str]:
+        """
+        Write DataFrames to a directory concurrently, one file each.
+        
+        The writes are independent I/O (and pyarrow releases the GIL while
+        encoding), so they run on a small thread pool.
         
         Args:
             dataframes: Dictionary of DataFrames to save
-            format: File format (csv or parquet)
+            directory: Target directory
+            format: File format (parquet, feather or csv)
             prefix: Prefix for output filenames
+            label: Dataset stage used in log messages
             
         Returns:
             Dictionary with saved file paths
         """
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        saved_paths = {}
-        
-        for name, df in dataframes.items():
+        def write_one(item):
+            name, df = item
             if df.empty:
-                logger.warning(f"DataFrame '{name}' is empty, skipping")
-                continue
+                logger.warning("DataFrame '%s' is empty, skipping", name)
+                return None
                 
-            filename = f"{prefix}_{name}_{timestamp}.{format}"
-            file_path = self.processed_dir / filename
+            filename = f"{prefix}_{name}_{self.run_ts}.{format}"
+            file_path = directory / filename
             
             try:
-                if format.lower() == "csv":
-                    df.to_csv(file_path, index=False)
-                elif format.lower() == "parquet":
-                    df.to_parquet(file_path, index=False)
-                else:
-                    raise ValueError(f"Unsupported format: {format}")
-                    
-                saved_paths[name] = str(file_path)
-                logger.info(f"Processed {name} data saved to {file_path}")
-                
+                self._write_dataframe(df, file_path, format)
+                logger.info("%s %s data saved to %s", label, name, file_path)
+                return name, str(file_path)
             except Exception as e:
-                logger.error(f"Error saving {name} data: {str(e)}")
+                logger.error("Error saving %s %s data: %s", label.lower(), name, e)
+                return None
                 
-        return saved_paths
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = executor.map(write_one, dataframes.items())
+            return dict(result for result in results if result)
+            
+    def save_processed_data(self, 
+                          dataframes: Dict[str, pd.DataFrame], 
+                          format: str = "parquet",
+                          prefix: str = "spotify") -> Dict[str, str]:
+        """
+        Save processed DataFrames to files.
+        
+        Args:
+            dataframes: Dictionary of DataFrames to save
+            format: File format (parquet, feather or csv)
+            prefix: Prefix for output filenames
+            
+        Returns:
+            Dictionary with saved file paths
+        """
+        return self._save_dataframes(dataframes, self.processed_dir, format, prefix, "Processed")
     
     def save_final_data(self, 
                       dataframes: Dict[str, pd.DataFrame],
-                      format: str = "csv",
+                      format: str = "parquet",
                       prefix: str = "spotify_final") -> Dict[str, str]:
         """
         Save final processed DataFrames to the final directory.
         
         Args:
             dataframes: Dictionary of final DataFrames to save
-            format: File format (csv or parquet)
+            format: File format (parquet, feather or csv)
             prefix: Prefix for output filenames
             
         Returns:
             Dictionary with saved file paths
         """
-        # Similar to save_processed_data but with different directory
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        saved_paths = {}
-        
-        for name, df in dataframes.items():
-            if df.empty:
-                logger.warning(f"DataFrame '{name}' is empty, skipping")
-                continue
-                
-            filename = f"{prefix}_{name}_{timestamp}.{format}"
-            file_path = self.final_dir / filename
-            
-            try:
-                if format.lower() == "csv":
-                    df.to_csv(file_path, index=False)
-                elif format.lower() == "parquet":
-                    df.to_parquet(file_path, index=False)
-                else:
-                    raise ValueError(f"Unsupported format: {format}")
-                    
-                saved_paths[name] = str(file_path)
-                logger.info(f"Final {name} data saved to {file_path}")
-                
-            except Exception as e:
-                logger.error(f"Error saving final {name} data: {str(e)}")
-                
-        return saved_paths
+        return self._save_dataframes(dataframes, self.final_dir, format, prefix, "Final")
     
     def create_latest_symlinks(self, 
                              file_paths: Dict[str, str], 
@@ -177,19 +214,19 @@ class SpotifyDataLoader:
             directory = self.final_dir
             
         for name, path in file_paths.items():
-            # Create a 'latest' symlink
-            latest_path = directory / f"{name}_latest.csv"
+            # Create a 'latest' symlink with the same extension as its target
+            latest_path = directory / f"{name}_latest{Path(path).suffix}"
             
             # Remove existing symlink if it exists
             if os.path.islink(latest_path):
                 os.unlink(latest_path)
                 
             try:
-                # Create relative symlink
+                # Create symlink relative to the link's directory
                 os.symlink(
-                    os.path.basename(path),
+                    os.path.relpath(path, directory),
                     latest_path
                 )
-                logger.info(f"Created symlink: {latest_path} -> {path}")
+                logger.info("Created symlink: %s -> %s", latest_path, path)
             except Exception as e:
-                logger.error(f"Error creating symlink: {str(e)}")
\ No newline at end of file
+                logger.error("Error creating symlink: %s", e)
\ No newline at end of file
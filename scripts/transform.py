@@ -9,13 +9,86 @@ import logging
 from typing import Dict, Any
 from datetime import datetime
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,  # Se cambió a DEBUG para más información
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# El logging lo configura el punto de entrada (etl_pipeline / DAG)
 logger = logging.getLogger(__name__)
 
+# Campos de primer nivel del album enriquecido que usa transform_albums
+ALBUM_SOURCE_COLUMNS = [
+    "album_id", "album_name", "album_type", "release_date", "total_tracks", "popularity",
+    "image_url", "spotify_url"
+]
+
+# Columnas de los tracks normalizados que usa transform_tracks
+TRACK_SOURCE_COLUMNS = [
+    "id", "name", "album_id", "artists", "track_number", "duration_ms", "explicit",
+    "external_urls.spotify"
+]
+
+# Esquemas fijos de salida (columna -> dtype), también para los DataFrames vacíos.
+# Las columnas de baja cardinalidad van como category y las métricas de audio en
+# float32 (la mitad de memoria, precisión de sobra)
+ALBUM_SCHEMA = {
+    "album_id": "string",
+    "album_name": "string",
+    "album_type": "category",
+    "release_date": "string",
+    "total_tracks": "Int64",
+    "popularity": "Int64",
+    "main_artist_id": "category",
+    "main_artist_name": "string",
+    "artist_genres": "category",
+    "image_url": "string",
+    "spotify_url": "string",
+    "extraction_date": "string"
+}
+
+TRACK_SCHEMA = {
+    "track_id": "string",
+    "track_name": "string",
+    "album_id": "category",
+    "artists": "string",
+    "track_number": "Int64",
+    "duration_ms": "Int64",
+    "explicit": "bool",
+    "spotify_url": "string",
+    "extraction_date": "string"
+}
+
+AUDIO_FEATURES_SCHEMA = {
+    "track_id": "string",
+    "danceability": "float32",
+    "energy": "float32",
+    "loudness": "float32",
+    "tempo": "float32",
+    "extraction_date": "string"
+}
+
+# Tracks con sus métricas de audio (la extraction_date es la del track)
+MERGED_SCHEMA = {
+    **TRACK_SCHEMA,
+    **{c: t for c, t in AUDIO_FEATURES_SCHEMA.items() if c not in ("track_id", "extraction_date")}
+}
+
+# Categorías: todavía no hay transformación, pero el DataFrame vacío mantiene su esquema
+CATEGORY_SCHEMA = {
+    "category_id": "string",
+    "category_name": "string",
+    "extraction_date": "string"
+}
+
+
+def _join_artist_names(artists: Any) -> str:
+    """Comma-separated artist names of a track."""
+    if not isinstance(artists, list):
+        return ""
+    return ", ".join(artist.get("name", "Unknown Artist") for artist in artists)
+
+
+def _empty_frame(schema: Dict[str, str]) -> pd.DataFrame:
+    """Empty DataFrame with the columns and dtypes of a schema."""
+    return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in schema.items()})
+
+
 class SpotifyTransformer:
     """
     Transformer for Spotify data.
@@ -30,75 +103,129 @@ class SpotifyTransformer:
             raw_data: Dictionary containing raw Spotify data
         """
         self.raw_data = raw_data
-        self.albums_df = pd.DataFrame()  # Siempre inicia como un DataFrame vacío
-        self.tracks_df = pd.DataFrame()
-        self.audio_features_df = pd.DataFrame()
-        self.categories_df = pd.DataFrame()
+        # None = todavía sin transformar; cada transform_* se ejecuta una sola vez
+        self._albums_df = None
+        self._tracks_df = None
+        self._audio_features_df = None
+        self.categories_df = _empty_frame(CATEGORY_SCHEMA)
+        self._records = None
+        
+    @property
+    def albums_df(self) -> pd.DataFrame:
+        """Album DataFrame, transformed on first access."""
+        return self.transform_albums()
+        
+    @property
+    def tracks_df(self) -> pd.DataFrame:
+        """Track DataFrame, transformed on first access."""
+        return self.transform_tracks()
+        
+    @property
+    def audio_features_df(self) -> pd.DataFrame:
+        """Audio features DataFrame, transformed on first access."""
+        return self.transform_audio_features()
+        
+    def _build_all_records(self) -> Dict[str, list]:
+        """
+        Walk the releases once, collecting what the album and track frames need.
+        
+        Returns:
+            Dictionary with the releases, their main artist ids, names and
+            genres (one entry per release), and the flat list of tracks
+            tagged with their album_id
+        """
+        if self._records is not None:
+            return self._records
+            
+        releases = self.raw_data.get("releases", [])
+        artist_ids, artist_names, genres, tracks = [], [], [], []
+        
+        for album in releases:
+            artists = album.get("artists")
+            main_artist = artists[0] if artists else {}
+            artist_ids.append(main_artist.get("id"))
+            artist_names.append(main_artist.get("name"))
+            
+            details = album.get("main_artist_details")
+            genres.append(", ".join(details.get("genres") or []) if details else "")
+            
+            album_id = album.get("album_id")
+            for track in album.get("tracks") or []:
+                tracks.append({**track, "album_id": album_id})
+                
+        self._records = {
+            "releases": releases,
+            "main_artist_ids": artist_ids,
+            "main_artist_names": artist_names,
+            "artist_genres": genres,
+            "tracks": tracks
+        }
+        return self._records
 
     def transform_albums(self) -> pd.DataFrame:
-        """ Transform raw album data into a structured DataFrame. """
+        """ Transform raw album data into a structured DataFrame (cached). """
+        if self._albums_df is not None:
+            return self._albums_df
+            
         logger.debug("Transforming album data...")
         
-        albums_data = []
-        for album in self.raw_data.get("releases", []):
-            album_row = {
-                "album_id": album.get("album_id"),
-                "album_name": album.get("album_name"),
-                "album_type": album.get("album_type"),
-                "release_date": album.get("release_date"),
-                "total_tracks": album.get("total_tracks"),
-                "popularity": album.get("popularity"),
-                "main_artist_id": album.get("artists", [{}])[0].get("id") if album.get("artists") else None,
-                "main_artist_name": album.get("artists", [{}])[0].get("name") if album.get("artists") else None,
-                "artist_genres": album.get("main_artist_details", {}).get("genres", []) if album.get("main_artist_details") else [],
-                "image_url": album.get("image_url"),
-                "spotify_url": album.get("spotify_url"),
-                "extraction_date": datetime.now().strftime("%Y-%m-%d")
-            }
-            albums_data.append(album_row)
-
-        if not albums_data:
+        records = self._build_all_records()
+        if not records["releases"]:
             logger.warning("No album data to transform")
-            self.albums_df = pd.DataFrame()
-            return self.albums_df
+            self._albums_df = _empty_frame(ALBUM_SCHEMA)
+            return self._albums_df
             
-        self.albums_df = pd.DataFrame(albums_data)
-        self.albums_df["artist_genres"] = self.albums_df["artist_genres"].apply(lambda x: ", ".join(x) if isinstance(x, list) else "")
-        logger.info(f"Transformed {len(self.albums_df)} album records")
-        return self.albums_df
+        # Campos de primer nivel por columna; los anidados ya vienen de _build_all_records
+        raw_df = pd.DataFrame.from_records(records["releases"]).reindex(columns=ALBUM_SOURCE_COLUMNS)
+        
+        df = raw_df[["album_id", "album_name", "album_type", "release_date", "total_tracks", "popularity"]].copy()
+        df["main_artist_id"] = records["main_artist_ids"]
+        df["main_artist_name"] = records["main_artist_names"]
+        df["artist_genres"] = records["artist_genres"]
+        df["image_url"] = raw_df["image_url"]
+        df["spotify_url"] = raw_df["spotify_url"]
+        df["extraction_date"] = datetime.now().strftime("%Y-%m-%d")
+        df = df.astype(ALBUM_SCHEMA)
+        
+        self._albums_df = df
+        logger.info("Transformed %d album records", len(self._albums_df))
+        return self._albums_df
 
     def transform_tracks(self) -> pd.DataFrame:
-        """ Transform raw track data into a structured DataFrame. """
+        """ Transform raw track data into a structured DataFrame (cached). """
+        if self._tracks_df is not None:
+            return self._tracks_df
+            
         logger.debug("Transforming track data...")
         
-        tracks_data = []
-        for album in self.raw_data.get("releases", []):
-            for track in album.get("tracks", []):
-                artists = ", ".join([artist.get("name", "Unknown Artist") for artist in track.get("artists", [])])
-                track_row = {
-                    "track_id": track.get("id"),
-                    "track_name": track.get("name"),
-                    "album_id": album.get("album_id"),
-                    "artists": artists,
-                    "track_number": track.get("track_number"),
-                    "duration_ms": track.get("duration_ms"),
-                    "explicit": track.get("explicit", False),
-                    "spotify_url": track.get("external_urls", {}).get("spotify"),
-                    "extraction_date": datetime.now().strftime("%Y-%m-%d")
-                }
-                tracks_data.append(track_row)
-
-        if not tracks_data:
+        tracks = self._build_all_records()["tracks"]
+        if not tracks:
             logger.warning("No track data to transform")
-            self.tracks_df = pd.DataFrame()
-            return self.tracks_df
+            self._tracks_df = _empty_frame(TRACK_SCHEMA)
+            return self._tracks_df
             
-        self.tracks_df = pd.DataFrame(tracks_data)
-        logger.info(f"Transformed {len(self.tracks_df)} track records")
-        return self.tracks_df
+        # Una fila por track, con el album_id del album padre
+        raw_df = pd.json_normalize(tracks).reindex(columns=TRACK_SOURCE_COLUMNS)
+        
+        self._tracks_df = pd.DataFrame({
+            "track_id": raw_df["id"],
+            "track_name": raw_df["name"],
+            "album_id": raw_df["album_id"],
+            "artists": raw_df["artists"].map(_join_artist_names),
+            "track_number": raw_df["track_number"],
+            "duration_ms": raw_df["duration_ms"],
+            "explicit": raw_df["explicit"].astype("boolean").fillna(False).astype(bool),
+            "spotify_url": raw_df["external_urls.spotify"],
+            "extraction_date": datetime.now().strftime("%Y-%m-%d")
+        }).astype(TRACK_SCHEMA)
+        logger.info("Transformed %d track records", len(self._tracks_df))
+        return self._tracks_df
 
     def transform_audio_features(self) -> pd.DataFrame:
-        """ Transform raw audio features data into a structured DataFrame. """
+        """ Transform raw audio features data into a structured DataFrame (cached). """
+        if self._audio_features_df is not None:
+            return self._audio_features_df
+            
         logger.debug("Transforming audio features data...")
         
         audio_data = []
@@ -109,60 +236,44 @@ class SpotifyTransformer:
                     "danceability": feature.get("danceability"),
                     "energy": feature.get("energy"),
                     "loudness": feature.get("loudness"),
-                    "tempo": feature.get("tempo"),
-                    "extraction_date": datetime.now().strftime("%Y-%m-%d")
+                    "tempo": feature.get("tempo")
                 }
                 audio_data.append(audio_row)
 
         if not audio_data:
             logger.warning("No audio features data to transform")
-            self.audio_features_df = pd.DataFrame()  # Asegurar que sea un DataFrame vacío y no None
-            return self.audio_features_df
+            self._audio_features_df = _empty_frame(AUDIO_FEATURES_SCHEMA)
+            return self._audio_features_df
             
-        self.audio_features_df = pd.DataFrame(audio_data)
-        logger.info(f"Transformed {len(self.audio_features_df)} audio feature records")
-        return self.audio_features_df
+        df = pd.DataFrame(audio_data)
+        df["extraction_date"] = datetime.now().strftime("%Y-%m-%d")
+        df = df.astype(AUDIO_FEATURES_SCHEMA)
+        
+        self._audio_features_df = df
+        logger.info("Transformed %d audio feature records", len(self._audio_features_df))
+        return self._audio_features_df
 
     def merge_track_audio_features(self) -> pd.DataFrame:
         """ Merge tracks with their audio features. """
         logger.debug("Merging track and audio feature data...")
 
-        # Asegurarnos de que los DataFrames no sean None
-        if self.tracks_df is None:
-            self.tracks_df = pd.DataFrame()
-        
-        if self.audio_features_df is None:
-            self.audio_features_df = pd.DataFrame()
-            
-        # Si están vacíos, intentar generar los datos
-        if self.tracks_df.empty:
-            logger.warning("Track DataFrame is empty! Running transform_tracks()")
-            self.tracks_df = self.transform_tracks()
-            
-        if self.audio_features_df.empty:
-            logger.warning("Audio Features DataFrame is empty! Running transform_audio_features()")
-            self.audio_features_df = self.transform_audio_features()
-            
-        # Verificación adicional después de intentar transformar
-        if self.tracks_df is None:
-            self.tracks_df = pd.DataFrame()
-        if self.audio_features_df is None:
-            self.audio_features_df = pd.DataFrame()
+        # Las propiedades transforman solo si hace falta (una vez por instancia)
+        tracks_df = self.tracks_df
+        audio_features_df = self.audio_features_df
             
-        if self.tracks_df.empty or self.audio_features_df.empty:
+        if tracks_df.empty or audio_features_df.empty:
             logger.error("Cannot merge track and audio features data. One of them is empty!")
-            return pd.DataFrame()
+            return _empty_frame(MERGED_SCHEMA)
 
-        merged_df = pd.merge(
-            self.tracks_df,
-            self.audio_features_df,
-            on="track_id",
-            how="left",
-            suffixes=("", "_audio")
-        )
+        # Join sobre índices track_id; extraction_date se descarta antes para no duplicarla
+        tracks = tracks_df.set_index(tracks_df["track_id"].astype("string[pyarrow]"))
+        tracks = tracks.drop(columns=["track_id"])
+        features = audio_features_df.drop(columns=["extraction_date"], errors="ignore")
+        features = features.set_index(features["track_id"].astype("string[pyarrow]"))
+        features = features.drop(columns=["track_id"])
 
-        if "extraction_date_audio" in merged_df.columns:
-            merged_df.drop(columns=["extraction_date_audio"], inplace=True)
+        merged_df = tracks.join(features, how="left", rsuffix="_audio").reset_index()
+        merged_df = merged_df.astype(MERGED_SCHEMA)
 
         logger.info(f"Merged dataset created with {len(merged_df)} records")
         return merged_df
@@ -174,5 +285,5 @@ class SpotifyTransformer:
             "albums": self.transform_albums(),
             "tracks": self.transform_tracks(),
             "audio_features": self.transform_audio_features(),
-            "categories": pd.DataFrame()  # Si no tienes la parte de categorías, evita errores retornando un DataFrame vacío
+            "categories": self.categories_df
         }
\ No newline at end of file
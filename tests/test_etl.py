@@ -0,0 +1,294 @@
+"""
+Tests for the Spotify ETL Pipeline
+"""
+
+import asyncio
+import os
+import sqlite3
+import time
+from datetime import timedelta
+
+import pandas as pd
+import pytest
+from aiohttp import ClientResponseError, ClientSession, web
+from aiohttp.test_utils import TestServer
+
+from config.config import Config, _parse_yaml_cached
+from scripts.extract import ResponseCache, SpotifyClient, TokenBucket
+from scripts.load import SpotifyDataLoader
+from scripts.transform import (
+    ALBUM_SCHEMA, AUDIO_FEATURES_SCHEMA, CATEGORY_SCHEMA, MERGED_SCHEMA, TRACK_SCHEMA,
+    SpotifyTransformer
+)
+
+
+async def _request_new_releases(client, handler):
+    """Call browse/new-releases on an in-process server answering with handler."""
+    app = web.Application()
+    app.router.add_get("/v1/browse/new-releases", handler)
+    async with TestServer(app) as server:
+        client.BASE_URL = str(server.make_url("/v1"))
+        async with ClientSession() as session:
+            return await client._make_request_async(session, "browse/new-releases", {"limit": 1})
+
+
+def _raw_data():
+    """Small raw extraction: 2 albums, 3 tracks, features for 2 of them plus an unknown ID."""
+    def track(track_id, number):
+        return {"id": track_id, "name": f"Track {track_id}", "track_number": number,
+                "duration_ms": 1000 * number, "explicit": number % 2 == 0,
+                "artists": [{"name": "A"}, {"name": "B"}],
+                "external_urls": {"spotify": f"https://open.spotify.com/track/{track_id}"}}
+
+    def album(album_id, tracks):
+        return {"album_id": album_id, "album_name": f"Album {album_id}", "album_type": "single",
+                "release_date": "2024-01-01", "total_tracks": len(tracks), "popularity": 10,
+                "artists": [{"id": "ar1", "name": "Artist 1"}],
+                "main_artist_details": {"genres": ["pop", "rock"]},
+                "tracks": tracks, "image_url": None, "spotify_url": f"https://open.spotify.com/album/{album_id}"}
+
+    return {
+        "releases": [album("al1", [track("t1", 1), track("t2", 2)]), album("al2", [track("t3", 1)])],
+        "audio_features": [
+            {"id": "t1", "danceability": 0.5, "energy": 0.25, "loudness": -5.5, "tempo": 120.0},
+            None,
+            {"id": "t3", "danceability": 0.75, "energy": 0.5, "loudness": -7.0, "tempo": 98.5},
+            {"id": "unknown", "danceability": 0.1, "energy": 0.1, "loudness": -1.0, "tempo": 60.0},
+        ],
+        "categories": []
+    }
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """SpotifyClient that never calls the real token endpoint."""
+    monkeypatch.setattr(SpotifyClient, "_get_token", lambda self: setattr(self, "token", "test-token"))
+    return SpotifyClient("client-id", "client-secret")
+
+
+def test_response_cache_hit_and_expiry(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"), expire_after=timedelta(hours=6))
+    key = ResponseCache.make_key("albums", {"ids": "a,b"})
+
+    assert cache.get(key) is None
+    cache.set(key, {"albums": [{"id": "a"}, {"id": "b"}]})
+    assert cache.get(key) == {"albums": [{"id": "a"}, {"id": "b"}]}
+
+    # Keys depend on the endpoint and the exact params
+    assert ResponseCache.make_key("albums", {"ids": "a,b"}) == key
+    assert ResponseCache.make_key("albums", {"ids": "b,a"}) != key
+
+    # Past expire_after the entry is ignored
+    later = time.time() + timedelta(hours=7).total_seconds()
+    monkeypatch.setattr(time, "time", lambda: later)
+    assert cache.get(key) is None
+
+
+def test_response_cache_prunes_expired_and_skips_corrupt_entries(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(path)
+    cache.set("old", {"id": "old"})
+    cache.set("corrupt", {"id": "corrupt"})
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE responses SET body = ? WHERE endpoint_hash = 'corrupt'", (b"{not json",))
+    conn.close()
+
+    assert cache.get("corrupt") is None
+
+    # Reopening the cache later deletes the expired rows
+    later = time.time() + timedelta(hours=7).total_seconds()
+    monkeypatch.setattr(time, "time", lambda: later)
+    ResponseCache(path)
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM responses").fetchone() == (0,)
+    conn.close()
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(capacity=2, rate=20)
+
+    async def acquire_all():
+        start = time.monotonic()
+        await asyncio.gather(*[bucket.acquire() for _ in range(6)])
+        return time.monotonic() - start
+
+    # 2 tokens are available at once, the other 4 refill at 20 per second
+    elapsed = asyncio.run(acquire_all())
+    assert elapsed >= 0.18
+
+    # The bucket still works in a later event loop
+    assert asyncio.run(acquire_all()) >= 0.18
+
+
+def test_token_bucket_allows_burst_then_waits_for_refill():
+    bucket = TokenBucket(capacity=5, rate=10)
+
+    async def timed_acquires(count):
+        start = time.monotonic()
+        for _ in range(count):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    async def run():
+        return await timed_acquires(5), await timed_acquires(1)
+
+    burst, next_token = asyncio.run(run())
+    assert burst < 0.05
+    assert next_token >= 0.08
+
+
+def test_rate_limited_request_retries_after_delay(client):
+    hits = []
+
+    async def new_releases(request):
+        hits.append(time.monotonic())
+        if len(hits) == 1:
+            return web.json_response({}, status=429, headers={"Retry-After": "0.3"})
+        return web.json_response({"albums": {"items": [{"id": "a"}]}})
+
+    data = asyncio.run(_request_new_releases(client, new_releases))
+
+    assert data == {"albums": {"items": [{"id": "a"}]}}
+    assert len(hits) == 2
+    assert hits[1] - hits[0] >= 0.3
+
+
+def test_rate_limited_request_gives_up_on_long_retry_after(client):
+    hits = []
+
+    async def new_releases(request):
+        hits.append(time.monotonic())
+        return web.json_response({}, status=429, headers={"Retry-After": "3600"})
+
+    start = time.monotonic()
+    with pytest.raises(ClientResponseError) as excinfo:
+        asyncio.run(_request_new_releases(client, new_releases))
+
+    assert excinfo.value.status == 429
+    assert len(hits) == 1
+    assert time.monotonic() - start < client.MAX_RETRY_DELAY
+
+
+def test_request_semaphore_follows_event_loop(client):
+    async def get_semaphore():
+        return client._get_semaphore(), client._get_semaphore()
+
+    first, same_loop = asyncio.run(get_semaphore())
+    second, _ = asyncio.run(get_semaphore())
+
+    assert first is same_loop
+    assert second is not first
+
+
+def test_config_yaml_parsed_once_per_mtime(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("transformations:\n  batch_size: 10\n")
+
+    first = Config(str(path))
+    misses = _parse_yaml_cached.cache_info().misses
+    second = Config(str(path))
+    assert _parse_yaml_cached.cache_info().misses == misses
+
+    # Each Config gets its own copy of the cached dict
+    first.config_data["transformations"]["batch_size"] = 99
+    assert second.get("transformations.batch_size") == 10
+    assert Config(str(path)).get("transformations.batch_size") == 10
+
+    # Editing the file (new mtime) is picked up
+    path.write_text("transformations:\n  batch_size: 30\n")
+    newer = os.path.getmtime(path) + 10
+    os.utime(path, (newer, newer))
+    assert Config(str(path)).get("transformations.batch_size") == 30
+
+
+def test_config_get_memoized_lookups(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("transformations:\n  batch_size: 10\n  enabled: false\n  empty:\n")
+    config = Config(str(path))
+
+    for _ in range(2):
+        assert config.get("transformations.batch_size") == 10
+        assert config.get("transformations.enabled", True) is False
+        assert config.get("transformations.empty", "default") is None
+        assert config.get("transformations.batch_size.deeper", "default") == "default"
+
+    # A cached miss still honors each call's own default
+    assert config.get("missing.key", "a") == "a"
+    assert config.get("missing.key", "b") == "b"
+    assert config.get("missing.key") is None
+
+    # Reloading drops the memoized values
+    path.write_text("transformations:\n  batch_size: 20\n")
+    newer = os.path.getmtime(path) + 10
+    os.utime(path, (newer, newer))
+    config._load_config()
+    assert config.get("transformations.batch_size") == 20
+    assert config.get("transformations.enabled", True) is True
+
+
+def test_config_sidecar_ignored_when_yaml_is_replaced(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("transformations:\n  batch_size: 10\n")
+    assert Config(str(path)).get("transformations.batch_size") == 10
+    assert os.path.exists(str(path) + ".json")
+
+    # Same size, older mtime: what cp -p, tar or rsync -t leave behind
+    older = os.path.getmtime(path) - 3600
+    path.write_text("transformations:\n  batch_size: 20\n")
+    os.utime(path, (older, older))
+
+    assert Config(str(path)).get("transformations.batch_size") == 20
+
+
+def test_latest_symlinks_resolve_to_this_runs_files(tmp_path, monkeypatch):
+    # Relative base path: links must still resolve from their own directory
+    monkeypatch.chdir(tmp_path)
+    loader = SpotifyDataLoader(base_path="data", run_ts="20240101_120000")
+    df = pd.DataFrame({"album_id": ["a", "b"], "popularity": [1, 2]})
+
+    paths = loader.save_final_data({"albums": df, "tracks": df}, format="csv")
+    loader.create_latest_symlinks(paths)
+
+    for name in ("albums", "tracks"):
+        assert paths[name].endswith(f"_{name}_20240101_120000.csv")
+        link = tmp_path / "data" / "final" / f"{name}_latest.csv"
+        assert os.path.exists(link)
+        assert not os.path.isabs(os.readlink(link))
+        assert os.path.samefile(link, paths[name])
+
+    # A later run replaces the links
+    later = SpotifyDataLoader(base_path="data", run_ts="20240102_120000")
+    later.create_latest_symlinks(later.save_final_data({"albums": df}, format="csv"))
+    assert os.path.realpath("data/final/albums_latest.csv").endswith("_albums_20240102_120000.csv")
+
+
+def test_merge_matches_left_merge_on_track_id():
+    transformer = SpotifyTransformer(_raw_data())
+
+    merged = transformer.merge_track_audio_features()
+
+    expected = pd.merge(
+        transformer.tracks_df, transformer.audio_features_df,
+        on="track_id", how="left", suffixes=("", "_audio")
+    ).drop(columns=["extraction_date_audio"])
+    pd.testing.assert_frame_equal(merged, expected, check_dtype=False)
+    assert merged["track_id"].tolist() == ["t1", "t2", "t3"]
+    assert merged["energy"].isna().tolist() == [False, True, False]
+
+
+@pytest.mark.parametrize("raw_data", [_raw_data(), {}], ids=["populated", "empty"])
+def test_transforms_return_fixed_schemas(raw_data):
+    transformer = SpotifyTransformer(raw_data)
+    frames = transformer.transform_all()
+    frames["merged"] = transformer.merge_track_audio_features()
+
+    schemas = {
+        "albums": ALBUM_SCHEMA,
+        "tracks": TRACK_SCHEMA,
+        "audio_features": AUDIO_FEATURES_SCHEMA,
+        "categories": CATEGORY_SCHEMA,
+        "merged": MERGED_SCHEMA,
+    }
+    for name, schema in schemas.items():
+        assert frames[name].dtypes.astype(str).to_dict() == schema, name
+        assert list(frames[name].columns) == list(schema), name